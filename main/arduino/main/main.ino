@@ -34,6 +34,12 @@ CalState calState = CAL_INIT;
 float calWeight = 0;
 unsigned long calTimer = 0;
 
+// Measurements are sent as binary frames: SAMPLE_TAG, the weight as a
+// 4-byte little-endian float, then a checksum byte (XOR of the four weight
+// bytes and CHECKSUM_SEED). Status messages stay ASCII lines.
+const byte SAMPLE_TAG = 0x01;
+const byte CHECKSUM_SEED = 0xA5;
+
 // Serial parsing
 const byte MAX_CHARS = 32;
 char buffer[MAX_CHARS];
@@ -149,7 +155,14 @@ void processCommands() {
 void doMeasurement() {
   if (scale.is_ready()) {
     float weight = scale.get_units();
-    Serial.println(weight, 2);
+    const uint8_t* payload = (const uint8_t*)&weight;
+    byte checksum = CHECKSUM_SEED;
+    for (byte i = 0; i < sizeof(weight); i++) {
+      checksum ^= payload[i];
+    }
+    Serial.write(SAMPLE_TAG);
+    Serial.write(payload, sizeof(weight));
+    Serial.write(checksum);
   }
 }
 
@@ -1,9 +1,85 @@
+import math
+import queue
 import serial
 import serial.tools.list_ports
+import struct
+import sys
+import threading
 import time
 
+# Delay before buffered writes are pushed to the port, so back-to-back
+# commands go out in a single write
+WRITE_COALESCE_S = 0.015
+
+# Measurements arrive as binary frames: SAMPLE_TAG, the weight as a
+# little-endian float32, then a checksum byte (XOR of the four payload bytes
+# and CHECKSUM_SEED). SAMPLE_TAG never occurs in the ASCII status lines.
+SAMPLE_TAG = 0x01
+CHECKSUM_SEED = 0xA5
+_SAMPLE = struct.Struct('<BfB')
+
+# Status lines are short and end in \r\n (println); anything longer is
+# garbage left over from a corrupted frame
+MAX_LINE_LENGTH = 128
+
+# Driver buffer sizes requested on Windows, where the default input buffer
+# is only 4 KiB
+RX_BUFFER_SIZE = 65536
+TX_BUFFER_SIZE = 8192
+
+# comports() can be slow (WMI/SetupAPI on Windows), so results are reused
+# for a short while
+_TTL = 2.0
+_ports_cache = {"t": 0.0, "v": None}
+
+def _comports(force=False):
+    '''Return cached (device, description, hwid) tuples for all ports'''
+    now = time.monotonic()
+    if force or _ports_cache["v"] is None or now - _ports_cache["t"] >= _TTL:
+        ports = serial.tools.list_ports.comports()
+        _ports_cache["v"] = [(port.device, port.description, port.hwid) for port in ports]
+        _ports_cache["t"] = now
+    return _ports_cache["v"]
+
+def _valid_sample(buf, i):
+    '''Return the weight of the frame at buf[i], or None if it fails validation'''
+    _, weight, checksum = _SAMPLE.unpack_from(buf, i)
+    expected = CHECKSUM_SEED
+    for b in buf[i + 1:i + 5]:
+        expected ^= b
+    if checksum != expected or not math.isfinite(weight):
+        return None
+    return weight
+
+def _starts_message(buf, i, end):
+    '''
+    Whether a valid frame or status line starts at buf[i]; None if more data
+    is needed to tell
+    '''
+    if i >= end:
+        return None
+    if buf[i] == SAMPLE_TAG:
+        if end - i < _SAMPLE.size:
+            return None
+        return _valid_sample(buf, i) is not None
+    nl = buf.find(b'\r\n', i, min(end, i + MAX_LINE_LENGTH))
+    if nl < 0:
+        return None if end < i + MAX_LINE_LENGTH else False
+    line = buf[i:nl]
+    return line.isascii() and SAMPLE_TAG not in line and line.decode('ascii').isprintable()
+
 class ArduinoController:
 
+    # Encoded forms of the fixed commands understood by the sketch
+    _CMD = {
+        "start": b"<start>\n",
+        "stop": b"<stop>\n",
+        "tare": b"<tare>\n",
+        "cancel": b"<cancel>\n",
+        "get_scale": b"<get_scale>\n",
+        "calibrate": b"<calibrate>\n",
+    }
+
     def __init__(self, port=None, baud=115200, timeout=1):
         '''
         Initialize the Arduino Controller
@@ -19,15 +95,35 @@ class ArduinoController:
         self.ser = None
         self.connected = False
 
+        # Write buffer, flushed by a timer shortly after the first write
+        self._wbuf = bytearray()
+        self._wlock = threading.Lock()
+        self._wtimer = None
+        self.last_error = None
+
+        # Messages received by the reader thread, see start_reader()
+        self.messages = queue.Queue()
+        self._rx_tail = b''
+        self._rx_synced = True
+        self._reader = None
+        self._reader_running = False
+
     @staticmethod
-    def list_ports():
-        ports = serial.tools.list_ports.comports()
-        return [port.device for port in ports]
+    def list_ports(force=False):
+        '''
+        :param force: Re-enumerate even if a cached result is still fresh
+        '''
+        return [device for device, _, _ in _comports(force)]
     
     @staticmethod
-    def get_ports_info():
-        ports = serial.tools.list_ports.comports()
-        return [(port.device, port.description, port.hwid) for port in ports]
+    def get_ports_info(force=False):
+        '''
+        Yield (device, description, hwid) for each port; wrap in list() if needed
+        
+        :param force: Re-enumerate even if a cached result is still fresh. As
+            this is a generator, that only happens once iteration starts.
+        '''
+        yield from _comports(force)
     
     def connect(self, port=None, baudrate=None, timeout = 5):
         if self.connected:
@@ -47,15 +143,31 @@ class ArduinoController:
                 timeout=self.timeout
             )
             
-            start_time = time.time()
+            if sys.platform == 'win32':
+                try:
+                    self.ser.set_buffer_size(rx_size=RX_BUFFER_SIZE, tx_size=TX_BUFFER_SIZE)
+                except Exception:
+                    # Only a hint to the driver, keep the defaults if refused
+                    pass
+            
             received_ready = False
-        
-            while (time.time() - start_time) < timeout:
-                if self.ser.in_waiting > 0:
-                    char = self.ser.read(1).decode('utf-8', errors='ignore')
-                    if char == 'r':
+            
+            # Block in the driver for each byte instead of polling in_waiting
+            prev_timeout = self.ser.timeout
+            try:
+                deadline = time.monotonic() + timeout
+                while time.monotonic() < deadline:
+                    # Only wait for what is left, so stray bytes can't stretch
+                    # the handshake past the deadline
+                    self.ser.timeout = max(0, deadline - time.monotonic())
+                    char = self.ser.read(1)
+                    if not char:
+                        break
+                    if char == b'r':
                         received_ready = True
                         break
+            finally:
+                self.ser.timeout = prev_timeout
         
             if not received_ready:
                 self.ser.close()
@@ -63,54 +175,276 @@ class ArduinoController:
                 raise ConnectionError(f"Arduino did not send ready signal 'r' within {timeout} seconds")
         
             self.connected = True
+            self.last_error = None
+            self._rx_tail = b''
+            self._rx_synced = True
+            # Drop anything the reader queued after the previous session
+            # stopped being drained
+            self.messages = queue.Queue()
             return True
         except serial.SerialException as e:
             self.connected = False
             raise ConnectionError(f"Failed to connect to {self.port}: {str(e)}")
         
     def disconnect(self):
+        self.stop_reader()
         if self.ser and self.connected:
+            self.flush_now()
+        # A failed write may have cleared connected with the port still open
+        if self.ser and self.ser.is_open:
             self.ser.close()
         self.connected = False
 
     def is_connected(self):
         return self.connected
+
+    def connection_failed(self, error):
+        '''
+        Record a serial error seen outside the caller's control flow (timer
+        thread, reader thread, Tk file handler). is_connected() turns False
+        and the error is kept in last_error; the port stays open until
+        disconnect().
+        '''
+        if self.connected:
+            self.last_error = error
+            self.connected = False
     
     def write(self, data):
-        if not self.is_connected:
+        if not self.connected:
             raise ConnectionError("Not connected to Arduino")
         
         if isinstance(data, str):
             data = data.encode('utf-8')
 
+        # Keep ordering with lines still queued by write_line()
+        self.flush_now()
         return self.ser.write(data)
     
     def write_line(self, data):
+        '''
+        Queue a line for sending. Lines written within WRITE_COALESCE_S of
+        each other are sent together; call flush_now() to send immediately.
+        Unlike write(), nothing is returned since the bytes are not sent yet.
+        If the delayed write fails, is_connected() turns False and the
+        exception is kept in last_error.
+        '''
+        if not self.connected:
+            raise ConnectionError("Not connected to Arduino")
+
         if not data.endswith("\n"):
             data += '\n'
-        return self.write(data)
+        self._write_buffered(data.encode('utf-8'))
+
+    def send_cmd(self, name, value=None):
+        '''
+        Queue a command for sending, like write_line("<name>")
+        
+        :param name: Command name, eg. 'start' or 'weight'
+        :param value: Argument for commands such as <weight:X>; fixed commands
+            without a value are sent from pre-encoded bytes
+        '''
+        if not self.connected:
+            raise ConnectionError("Not connected to Arduino")
+
+        if value is None:
+            data = self._CMD.get(name)
+            if data is None:
+                data = b"<%b>\n" % name.encode('utf-8')
+        else:
+            data = b"<%b:%b>\n" % (name.encode('utf-8'), str(value).encode('utf-8'))
+        self._write_buffered(data)
+
+    def _write_buffered(self, data):
+        with self._wlock:
+            self._wbuf += data
+            if self._wtimer is None:
+                self._wtimer = threading.Timer(WRITE_COALESCE_S, self._flush)
+                self._wtimer.daemon = True
+                self._wtimer.start()
+
+    def _flush(self):
+        with self._wlock:
+            self._wtimer = None
+            data = bytes(self._wbuf)
+            self._wbuf.clear()
+            if data and self.connected:
+                try:
+                    self.ser.write(data)
+                except serial.SerialException as e:
+                    # Runs on the timer thread, so there is no caller to raise to
+                    self.connection_failed(e)
+
+    def flush_now(self):
+        '''Send any buffered lines without waiting for the flush timer'''
+        with self._wlock:
+            timer = self._wtimer
+        if timer is not None:
+            timer.cancel()
+        self._flush()
     
     def read(self, size=1):
-        if not self.is_connected():
+        if not self.connected:
             raise ConnectionError("Not connected to Arduino")
         return self.ser.read(size)
     
     def read_line(self):
-        if not self.is_connected():
+        if not self.connected:
             raise ConnectionError("Not connected to Arduino")
         
         if self.ser.in_waiting > 0:
             return self.ser.readline().decode('utf-8', errors='ignore').strip()
         return ""
     
+    def read_available(self, min_size=0):
+        '''
+        Read everything currently in the OS receive buffer in one call
+        
+        :param min_size: Bytes to wait for (up to the timeout) if the buffer is empty
+        '''
+        if not self.connected:
+            raise ConnectionError("Not connected to Arduino")
+        return self.ser.read(self.ser.in_waiting or min_size)
+    
+    def read_messages(self, min_size=0):
+        '''
+        Return the complete messages in the receive buffer, keeping any
+        partial message for the next call. Measurement frames are returned
+        as floats, status lines as stripped strings.
+        '''
+        return self._parse(self.read_available(min_size))
+    
+    def _parse(self, data):
+        buf = self._rx_tail + data
+        end = len(buf)
+        messages = []
+        i = 0
+        while i < end:
+            if buf[i] == SAMPLE_TAG:
+                if end - i < _SAMPLE.size:
+                    break
+                weight = _valid_sample(buf, i)
+                nxt = i + _SAMPLE.size
+                if weight is None:
+                    pass
+                elif not self._rx_synced:
+                    # After corruption a passing checksum alone isn't trusted:
+                    # the frame must also be followed by a valid frame or line
+                    followed = _starts_message(buf, nxt, end)
+                    if followed is None:
+                        break
+                    if not followed:
+                        weight = None
+                elif nxt < end and not (buf[nxt] == SAMPLE_TAG or 0x41 <= buf[nxt] <= 0x5A):
+                    # A byte lost inside this frame pulled the next frame's
+                    # first byte in as the checksum; what follows a real frame
+                    # is a tag or the capital letter starting a status line
+                    weight = None
+                if weight is None:
+                    # Not a real frame start, resync one byte further on
+                    self._rx_synced = False
+                    i += 1
+                    continue
+                messages.append(weight)
+                self._rx_synced = True
+                i = nxt
+                continue
+            
+            limit = min(end, i + MAX_LINE_LENGTH)
+            nl = buf.find(b'\r\n', i, limit)
+            if nl < 0:
+                if limit < i + MAX_LINE_LENGTH:
+                    break  # line may still be arriving
+                # Overlong line: drop it and skip to the next possible frame
+                self._rx_synced = False
+                nxt = buf.find(SAMPLE_TAG, i + 1)
+                i = end if nxt < 0 else nxt
+                continue
+            
+            line = buf[i:nl]
+            tag = line.find(SAMPLE_TAG)
+            if tag >= 0:
+                # A frame starts inside this "line", so what precedes it is garbage
+                self._rx_synced = False
+                i += tag
+                continue
+            try:
+                line = line.decode('ascii').strip()
+            except UnicodeDecodeError:
+                line = None
+            if line is None or not line.isprintable():
+                self._rx_synced = False
+            elif line:
+                messages.append(line)
+            i = nl + 2
+        self._rx_tail = buf[i:]
+        return messages
+    
     def available(self):
-        if not self.is_connected():
+        if not self.connected:
             raise ConnectionError("Not connected to Arduino")
         return self.ser.in_waiting
     
+    def start_reader(self):
+        '''
+        Start a background thread that blocks on the port and puts every
+        received message onto self.messages, so callers never have to poll.
+        '''
+        if not self.connected:
+            raise ConnectionError("Not connected to Arduino")
+        if self._reader is not None:
+            return
+
+        self._reader_running = True
+        self._reader = threading.Thread(target=self._reader_loop, daemon=True)
+        self._reader.start()
+
+    def stop_reader(self):
+        thread = self._reader
+        if thread is None:
+            return
+        self._reader_running = False
+        self._reader = None
+        self.ser.cancel_read()
+        thread.join(self.timeout + 1)
+
+    def _reader_loop(self):
+        while self._reader_running and self.connected:
+            try:
+                # Block for the first byte, then take whatever else has arrived
+                messages = self.read_messages(min_size=1)
+            except ConnectionError:
+                # A failed write on the flush timer thread cleared connected
+                # (and set last_error) while we were blocked in read
+                break
+            except serial.SerialException as e:
+                # Port went away (eg. unplugged); report it the same way a
+                # failed write does, unless stop_reader() asked us to stop
+                if self._reader_running:
+                    self.connection_failed(e)
+                break
+            for msg in messages:
+                self.messages.put(msg)
+        self._reader_running = False
+
+    def fileno(self):
+        '''File descriptor of the open port (POSIX only)'''
+        return self.ser.fileno()
+
     def flush(self):
-        if self.is_connected():
+        if self.connected:
+            self.flush_now()
             self.ser.flush()
 
     def __del__(self):
-        self.disconnect()
\ No newline at end of file
+        # Don't go through disconnect(): during interpreter shutdown the
+        # serial module may already be torn down, so just close and stay quiet
+        try:
+            ser = self.ser
+            # is_open rather than connected: a failed write clears connected
+            # but leaves the port open
+            if ser is not None and ser.is_open:
+                ser.close()
+        except Exception:
+            pass
+        finally:
+            self.connected = False
@@ -4,19 +4,56 @@ from arduino_serial import ArduinoController
 import json
 import os
 import csv
+import math
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
 
+# Recorded rows are written by a background thread and flushed to disk in
+# batches; at most this many rows or this many seconds of data can be lost
+# if the program dies mid-recording
+CSV_FLUSH_ROWS = 100
+CSV_FLUSH_INTERVAL_S = 0.25
+CSV_QUEUE_SIZE = 10000
+CSV_TIMESTAMP_FMT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+# The display is trimmed by DISPLAY_TRIM_LINES once it grows past
+# DISPLAY_MAX_LINES, to keep redraws cheap during long measurements
+DISPLAY_MAX_LINES = 2000
+DISPLAY_TRIM_LINES = 1000
+
+def drain_queue(q):
+    """Yield items from q until it is empty, without blocking"""
+    while True:
+        try:
+            yield q.get_nowait()
+        except queue.Empty:
+            return
+
+
 class CalibrationWindow:
-    """Simple calibration window"""
-    def __init__(self, parent, arduino, main_text):
+    """Simple calibration window, fed Arduino messages by ArduinoGUI"""
+    def __init__(self, parent, arduino):
         self.arduino = arduino
-        self.main_text = main_text
         self.window = tk.Toplevel(parent)
         self.window.title("Scale Calibration")
         self.window.geometry("450x300")
         self.window.grab_set()
         
         self.state = "init"
+        self._handlers = {
+            "CAL_START": self._on_start,
+            "CAL_CLEAR_SCALE": self._on_clear,
+            "CAL_TARED": self._on_tared,
+            "CAL_WEIGHT": self._on_weight,
+            "CAL_RAW": self._on_raw,
+            "CAL_FACTOR": self._on_factor,
+            "CAL_TEST": self._on_test,
+            "CAL_ERROR": self._on_error,
+        }
         self.create_ui()
         self.start()
         
@@ -51,79 +88,71 @@ class CalibrationWindow:
         )
         self.state = "init"
         self.next_btn.pack_forget()  # Hide the Next button during step 1
-        self.arduino.write_line("<calibrate>")
-        self.monitor()
+        self.arduino.send_cmd("calibrate")
         
-    def monitor(self):
-        """Monitor Arduino responses"""
-        if not self.window.winfo_exists():
-            return
-            
-        try:
-            while self.arduino.available() > 0:
-                msg = self.arduino.read_line()
-                if msg:
-                    self.main_text.insert(tk.END, f"{msg}\n")
-                    self.main_text.see(tk.END)
-                    self.handle_message(msg)
-        except:
-            pass
-            
-        self.window.after(50, self.monitor)
+    def is_open(self):
+        return bool(self.window.winfo_exists())
         
-    def handle_message(self, msg):
-        if msg == "CAL_START":
-            # Confirmation that calibration started
-            self.state = "started"
-            
-        elif msg == "CAL_CLEAR_SCALE":
-            # Redundant check, but update if somehow missed
-            if self.state == "init":
-                self.instruction_label.config(
-                    text="Step 1: Clear the scale\n\nRemove all items from the scale.\n\nWaiting 2 seconds before taring..."
-                )
-            self.state = "clearing"
+    def dispatch(self, key, payload):
+        """Handle a message already split into prefix and payload"""
+        handler = self._handlers.get(key)
+        if handler:
+            handler(payload)
             
-        elif msg == "CAL_TARED":
+    def _on_start(self, payload):
+        # Confirmation that calibration started
+        self.state = "started"
+        
+    def _on_clear(self, payload):
+        # Redundant check, but update if somehow missed
+        if self.state == "init":
             self.instruction_label.config(
-                text="Step 2: Place known weight\n\nPlace a known weight on the scale.\n"
-                     "Enter the weight in grams and click Next."
+                text="Step 1: Clear the scale\n\nRemove all items from the scale.\n\nWaiting 2 seconds before taring..."
             )
-            self.weight_frame.pack(pady=10)
-            self.weight_entry.focus()
-            self.state = "need_weight"
-            self.next_btn.pack(side=tk.LEFT, padx=5)  # Show Next button now
+        self.state = "clearing"
+        
+    def _on_tared(self, payload):
+        self.instruction_label.config(
+            text="Step 2: Place known weight\n\nPlace a known weight on the scale.\n"
+                 "Enter the weight in grams and click Next."
+        )
+        self.weight_frame.pack(pady=10)
+        self.weight_entry.focus()
+        self.state = "need_weight"
+        self.next_btn.pack(side=tk.LEFT, padx=5)  # Show Next button now
+        self.next_btn.config(state=tk.NORMAL)
+        
+    def _on_weight(self, weight):
+        self.instruction_label.config(
+            text=f"Step 3: Measuring\n\nWeight: {weight}g\nWaiting for stable reading..."
+        )
+        self.next_btn.config(state=tk.DISABLED)
+        
+    def _on_raw(self, raw):
+        self.instruction_label.config(text=f"Reading scale...\nRaw value: {raw}")
+        
+    def _on_factor(self, factor):
+        self.instruction_label.config(text=f"Calibration factor calculated: {factor}")
+        
+    def _on_test(self, test):
+        self.instruction_label.config(
+            text=f"Calibration Complete!\n\nTest reading: {test}g\n\nYou can close this window."
+        )
+        self.next_btn.pack(side=tk.LEFT, padx=5)  # Show button as Close
+        self.next_btn.config(text="Close", command=self.window.destroy, state=tk.NORMAL)
+        self.weight_frame.pack_forget()
+        
+    def _on_error(self, error):
+        # Shown from an idle callback: this runs inside the GUI's read
+        # handlers, and a modal dialog there would let them re-enter
+        self.window.after_idle(self._show_error, error)
+        
+    def _show_error(self, error):
+        if not self.is_open():
+            return
+        messagebox.showerror("Calibration Error", error)
+        if "weight" in error.lower() and self.is_open():
             self.next_btn.config(state=tk.NORMAL)
-            
-        elif msg.startswith("CAL_WEIGHT:"):
-            weight = msg.split(":")[1]
-            self.instruction_label.config(
-                text=f"Step 3: Measuring\n\nWeight: {weight}g\nWaiting for stable reading..."
-            )
-            self.next_btn.config(state=tk.DISABLED)
-            
-        elif msg.startswith("CAL_RAW:"):
-            raw = msg.split(":")[1]
-            self.instruction_label.config(text=f"Reading scale...\nRaw value: {raw}")
-            
-        elif msg.startswith("CAL_FACTOR:"):
-            factor = msg.split(":")[1]
-            self.instruction_label.config(text=f"Calibration factor calculated: {factor}")
-            
-        elif msg.startswith("CAL_TEST:"):
-            test = msg.split(":")[1]
-            self.instruction_label.config(
-                text=f"Calibration Complete!\n\nTest reading: {test}g\n\nYou can close this window."
-            )
-            self.next_btn.pack(side=tk.LEFT, padx=5)  # Show button as Close
-            self.next_btn.config(text="Close", command=self.window.destroy, state=tk.NORMAL)
-            self.weight_frame.pack_forget()
-            
-        elif msg.startswith("CAL_ERROR:"):
-            error = msg.split(":", 1)[1]
-            messagebox.showerror("Calibration Error", error)
-            if "weight" in error.lower():
-                self.next_btn.config(state=tk.NORMAL)
                 
     def on_next(self):
         if self.state == "need_weight":
@@ -136,13 +165,14 @@ class CalibrationWindow:
                 if w <= 0:
                     messagebox.showerror("Error", "Weight must be positive")
                     return
-                self.arduino.write_line(f"<weight:{weight}>")
+                self.arduino.send_cmd("weight", weight)
                 self.next_btn.config(state=tk.DISABLED)
             except ValueError:
                 messagebox.showerror("Error", "Please enter a valid number")
                 
     def on_cancel(self):
-        self.arduino.write_line("<cancel>")
+        self.arduino.send_cmd("cancel")
+        self.arduino.flush_now()
         self.window.destroy()
 
 
@@ -154,15 +184,27 @@ class ArduinoGUI:
         
         self.arduino = ArduinoController()
         self.reading = False
+        self._serial_fd = None
         self.current_scale_factor = None
-        self.waiting_for_scale = False
+        self._scale_var = tk.BooleanVar(value=False)
+        self._closed = False
+        self.cal_window = None
         
         # CSV recording variables
         self.recording = False
         self.csv_file = None
         self.csv_writer = None
         self.record_start_time = None
+        self._t0_mono = 0.0
         self.record_duration = 0
+        self._last_shown_remaining = None
+        self._record_tick_id = None
+        self._csv_q = None
+        self._csv_stop = None
+        self._csv_thr = None
+        self._csv_error = None
+        self._csv_dropped = 0
+        self._row_cache = [None, None, None]
         
         self.create_ui()
         
@@ -183,7 +225,7 @@ class ArduinoGUI:
         ttk.Label(conn_frame, text="COM Port:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
         self.port_combo = ttk.Combobox(conn_frame, width=12, state="readonly")
         self.port_combo.grid(row=0, column=1, padx=5, pady=5)
-        ttk.Button(conn_frame, text="Refresh", command=self.refresh_ports, width=8).grid(row=0, column=2, padx=5, pady=5)
+        ttk.Button(conn_frame, text="Refresh", command=lambda: self.refresh_ports(force=True), width=8).grid(row=0, column=2, padx=5, pady=5)
         
         ttk.Label(conn_frame, text="Baud Rate:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
         self.baud_combo = ttk.Combobox(conn_frame, width=12, state="readonly", values=[9600, 19200, 38400, 57600, 115200])
@@ -209,7 +251,8 @@ class ArduinoGUI:
         cal_frame = ttk.LabelFrame(left_frame, text="Calibration Files", padding=10)
         cal_frame.pack(fill="x", pady=(0, 10))
         
-        ttk.Button(cal_frame, text="Save Calibration", command=self.save_calibration, width=22).pack(pady=5)
+        self.save_cal_btn = ttk.Button(cal_frame, text="Save Calibration", command=self.save_calibration, width=22)
+        self.save_cal_btn.pack(pady=5)
         ttk.Button(cal_frame, text="Load Calibration", command=self.load_calibration, width=22).pack(pady=5)
         
         # Recording section
@@ -257,8 +300,8 @@ class ArduinoGUI:
         
         self.refresh_ports()
         
-    def refresh_ports(self):
-        ports = ArduinoController.list_ports()
+    def refresh_ports(self, force=False):
+        ports = ArduinoController.list_ports(force=force)
         self.port_combo['values'] = ports
         if ports:
             self.port_combo.current(0)
@@ -288,7 +331,7 @@ class ArduinoGUI:
             messagebox.showerror("Error", str(e))
             
     def disconnect(self):
-        self.reading = False
+        self.stop_reading()
         self.arduino.disconnect()
         self.status_label.config(text="Status: Disconnected", foreground="red")
         self.connect_btn.config(text="Connect")
@@ -297,56 +340,113 @@ class ArduinoGUI:
         
     def start_reading(self):
         self.reading = True
-        self.read_loop()
+        if sys.platform != 'win32' and hasattr(self.root.tk, 'createfilehandler'):
+            # Let Tk call us when the port is readable instead of polling
+            self._serial_fd = self.arduino.fileno()
+            self.root.tk.createfilehandler(self._serial_fd, tk.READABLE, self._on_serial_readable)
+        else:
+            self.arduino.start_reader()
+            self.read_loop()
+            
+    def stop_reading(self):
+        self.reading = False
+        if self._serial_fd is not None:
+            self.root.tk.deletefilehandler(self._serial_fd)
+            self._serial_fd = None
+            
+    def _on_serial_readable(self, fd, mask):
+        try:
+            messages = self.arduino.read_messages(min_size=1)
+        except Exception as e:
+            # Readable but failing (eg. unplugged), or a failed write already
+            # dropped the connection
+            self.stop_reading()
+            self.arduino.connection_failed(e)
+            self.connection_lost()
+            return
+        try:
+            self.handle_messages(messages)
+        except:
+            self.stop_reading()
         
     def read_loop(self):
-        if self.reading and self.arduino.is_connected():
+        """Handle messages queued by the Arduino reader thread"""
+        if self.reading and not self.arduino.is_connected():
+            self.connection_lost()
+        elif self.reading:
+            # Handlers must not open modal dialogs directly (defer them with
+            # after_idle), or this tick would stall until the dialog closes
             try:
-                while self.arduino.available() > 0:
-                    data = self.arduino.read_line()
-                    if data:
-                        self.display_text.insert(tk.END, f"{data}\n")
-                        self.display_text.see(tk.END)
-                        
-                        # Check for scale factor response
-                        if data.startswith("SCALE_FACTOR:") and self.waiting_for_scale:
-                            self.current_scale_factor = float(data.split(":")[1])
-                            self.waiting_for_scale = False
-                        
-                        # Record measurement data if recording
-                        if self.recording:
-                            self.record_measurement(data)
-                            
-                self.root.after(50, self.read_loop)
+                self.handle_messages(drain_queue(self.arduino.messages))
+                self.root.after(20, self.read_loop)
             except:
                 self.reading = False
                 
+    def connection_lost(self):
+        """The controller dropped the connection after a failed read or write"""
+        error = self.arduino.last_error
+        self.disconnect()
+        messagebox.showerror("Error", f"Connection to Arduino lost:\n{error}")
+                
+    def handle_messages(self, messages):
+        ui_chunk = []
+        for data in messages:
+            if isinstance(data, float):
+                # Measurement sample
+                ui_chunk.append(f"{data:.2f}\n")
+                if self.recording:
+                    self.record_measurement(data)
+                continue
+            
+            ui_chunk.append(f"{data}\n")
+            key, _, payload = data.partition(":")
+            
+            # Check for scale factor response
+            if key == "SCALE_FACTOR":
+                self.current_scale_factor = float(payload)
+                self._scale_var.set(True)
+            
+            # Forward to the calibration window while it is open
+            if self.cal_window is not None:
+                if self.cal_window.is_open():
+                    self.cal_window.dispatch(key, payload)
+                else:
+                    self.cal_window = None
+        
+        # One insert and scroll per tick instead of per line
+        if ui_chunk:
+            self.display_text.insert(tk.END, "".join(ui_chunk))
+            self.trim_display()
+            self.display_text.see(tk.END)
+        
+        self.check_recording_duration()
+                
     def start_measurement(self):
         if not self.arduino.is_connected():
             messagebox.showwarning("Warning", "Not connected")
             return
-        self.arduino.write_line("<start>")
+        self.arduino.send_cmd("start")
         self.display_text.insert(tk.END, ">> START\n")
         
     def stop_measurement(self):
         if not self.arduino.is_connected():
             messagebox.showwarning("Warning", "Not connected")
             return
-        self.arduino.write_line("<stop>")
+        self.arduino.send_cmd("stop")
         self.display_text.insert(tk.END, ">> STOP\n")
         
     def tare(self):
         if not self.arduino.is_connected():
             messagebox.showwarning("Warning", "Not connected")
             return
-        self.arduino.write_line("<tare>")
+        self.arduino.send_cmd("tare")
         self.display_text.insert(tk.END, ">> TARE\n")
         
     def calibrate(self):
         if not self.arduino.is_connected():
             messagebox.showwarning("Warning", "Not connected")
             return
-        CalibrationWindow(self.root, self.arduino, self.display_text)
+        self.cal_window = CalibrationWindow(self.root, self.arduino)
         
     def send_command(self):
         if not self.arduino.is_connected():
@@ -360,46 +460,53 @@ class ArduinoGUI:
             
     def clear_display(self):
         self.display_text.delete(1.0, tk.END)
+        
+    def trim_display(self):
+        lines = int(self.display_text.index('end-1c').split('.')[0])
+        if lines > DISPLAY_MAX_LINES:
+            self.display_text.delete(1.0, f"{DISPLAY_TRIM_LINES + 1}.0")
     
     def save_calibration(self):
         if not self.arduino.is_connected():
             messagebox.showwarning("Warning", "Not connected")
             return
         
-        # Request current scale factor from Arduino
-        self.waiting_for_scale = True
-        self.arduino.write_line("<get_scale>")
-        
-        # Wait for response (with timeout)
-        max_wait = 2000  # 2 seconds
-        start = self.root.after(0, lambda: None)
-        
-        def check_response(waited=0):
-            if not self.waiting_for_scale:
-                # Got response
-                filename = filedialog.asksaveasfilename(
-                    defaultextension=".json",
-                    filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
-                )
-                if filename:
-                    try:
-                        data = {
-                            "scale_factor": self.current_scale_factor,
-                            "port": self.port_combo.get(),
-                            "baud_rate": int(self.baud_combo.get())
-                        }
-                        with open(filename, 'w') as f:
-                            json.dump(data, f, indent=2)
-                        messagebox.showinfo("Success", f"Calibration saved to:\n{filename}")
-                    except Exception as e:
-                        messagebox.showerror("Error", f"Failed to save:\n{str(e)}")
-            elif waited < max_wait:
-                self.root.after(50, lambda: check_response(waited + 50))
-            else:
-                self.waiting_for_scale = False
-                messagebox.showerror("Error", "Timeout waiting for scale factor")
+        # Request current scale factor from Arduino and wait for the reply;
+        # handle_messages sets _scale_var when SCALE_FACTOR arrives. The
+        # wait runs a nested event loop, so block a second Save meanwhile.
+        self.current_scale_factor = None
+        self._scale_var.set(False)
+        self.arduino.send_cmd("get_scale")
+        
+        self.save_cal_btn.config(state="disabled")
+        timeout_id = self.root.after(2000, lambda: self._scale_var.set(True))
+        self.root.wait_variable(self._scale_var)
+        if self._closed:
+            # on_closing released the wait and destroyed the root
+            return
+        self.root.after_cancel(timeout_id)
+        self.save_cal_btn.config(state="normal")
         
-        self.root.after(50, check_response)
+        if self.current_scale_factor is None:
+            messagebox.showerror("Error", "Timeout waiting for scale factor")
+            return
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if filename:
+            try:
+                data = {
+                    "scale_factor": self.current_scale_factor,
+                    "port": self.port_combo.get(),
+                    "baud_rate": int(self.baud_combo.get())
+                }
+                with open(filename, 'w') as f:
+                    json.dump(data, f, indent=2)
+                messagebox.showinfo("Success", f"Calibration saved to:\n{filename}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save:\n{str(e)}")
     
     def load_calibration(self):
         if not self.arduino.is_connected():
@@ -417,7 +524,7 @@ class ArduinoGUI:
                 
                 scale_factor = data.get("scale_factor")
                 if scale_factor:
-                    self.arduino.write_line(f"<set_scale:{scale_factor}>")
+                    self.arduino.send_cmd("set_scale", scale_factor)
                     messagebox.showinfo("Success", f"Calibration loaded!\nScale factor: {scale_factor}")
                 else:
                     messagebox.showerror("Error", "Invalid calibration file")
@@ -460,8 +567,17 @@ class ArduinoGUI:
             self.csv_writer = csv.writer(self.csv_file)
             self.csv_writer.writerow(['Timestamp', 'Elapsed_Time_s', 'Weight_g'])
             
+            # Hand rows to a writer thread so disk I/O never blocks the UI
+            self._csv_error = None
+            self._csv_dropped = 0
+            self._csv_q = queue.Queue(maxsize=CSV_QUEUE_SIZE)
+            self._csv_stop = threading.Event()
+            self._csv_thr = threading.Thread(target=self._csv_loop, daemon=True)
+            self._csv_thr.start()
+            
             self.recording = True
             self.record_start_time = datetime.now()
+            self._t0_mono = time.perf_counter()
             self.record_duration = duration
             
             # Update UI
@@ -471,71 +587,159 @@ class ArduinoGUI:
             self.duration_entry.config(state="disabled")
             
             # Start measurement if not already measuring
-            self.arduino.write_line("<start>")
+            self.arduino.send_cmd("start")
             
-            # Check duration
-            self.check_recording_duration()
+            # The countdown is updated from the read tick; this 1 Hz timer
+            # keeps it (and the automatic stop) going when no data arrives,
+            # e.g. after Stop is pressed mid-recording
+            self._last_shown_remaining = None
+            self._record_tick_id = self.root.after(1000, self._record_tick)
             
             messagebox.showinfo("Recording Started", f"Recording to:\n{full_filename}\nDuration: {duration} seconds")
             
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to start recording:\n{str(e)}")
-            if self.csv_file:
-                self.csv_file.close()
             self.recording = False
+            if self._record_tick_id is not None:
+                self.root.after_cancel(self._record_tick_id)
+                self._record_tick_id = None
+            self._close_csv()
+            messagebox.showerror("Error", f"Failed to start recording:\n{str(e)}")
     
     def stop_recording(self):
-        if self.csv_file:
-            self.csv_file.close()
-            self.csv_file = None
-            self.csv_writer = None
+        if self._record_tick_id is not None:
+            self.root.after_cancel(self._record_tick_id)
+            self._record_tick_id = None
         
         self.recording = False
+        error = self._close_csv()
+        dropped = self._csv_dropped
+        
         self.record_btn.config(text="Start Recording")
         self.record_status.config(text="Status: Not recording", foreground="gray")
         self.filename_entry.config(state="normal")
         self.duration_entry.config(state="normal")
         
-        messagebox.showinfo("Recording Stopped", "Recording has been saved")
+        if error is not None:
+            messagebox.showerror(
+                "Recording Failed",
+                f"Writing the recording failed:\n{error}\n\n"
+                f"Samples after the error were lost ({dropped} dropped)."
+            )
+        elif dropped:
+            messagebox.showwarning(
+                "Recording Stopped",
+                f"Recording has been saved, but {dropped} samples were dropped "
+                "because the disk could not keep up."
+            )
+        else:
+            messagebox.showinfo("Recording Stopped", "Recording has been saved")
+    
+    def _close_csv(self):
+        """Stop the writer thread and close the file; return the first write error"""
+        if self._csv_thr:
+            self._csv_stop.set()
+            self._csv_thr.join()
+            self._csv_thr = None
+            if self._csv_error is not None:
+                # Whatever the dead writer left in the queue is lost too
+                self._csv_dropped += self._csv_q.qsize()
+        
+        if self.csv_file:
+            try:
+                self.csv_file.close()
+            except Exception as e:
+                if self._csv_error is None:
+                    self._csv_error = e
+            self.csv_file = None
+            self.csv_writer = None
+        return self._csv_error
+    
+    def record_measurement(self, weight):
+        if self._csv_error is not None:
+            # Writer thread has stopped, reported by stop_recording
+            self._csv_dropped += 1
+            return
+        
+        # Wall-clock time is only needed for the Timestamp column
+        elapsed = time.perf_counter() - self._t0_mono
+        try:
+            self._csv_q.put_nowait((datetime.now(), elapsed, weight))
+        except queue.Full:
+            # Writer has fallen too far behind, drop the sample
+            self._csv_dropped += 1
     
-    def record_measurement(self, data):
-        # Only record numeric data (measurements)
+    def _csv_loop(self):
+        """Writer thread: drain queued samples into the CSV file"""
         try:
-            weight = float(data)
-            timestamp = datetime.now()
-            elapsed = (timestamp - self.record_start_time).total_seconds()
-            
-            self.csv_writer.writerow([
-                timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
-                f"{elapsed:.3f}",
-                f"{weight:.2f}"
-            ])
-            self.csv_file.flush()  # Ensure data is written immediately
+            self._write_csv_rows()
+        except Exception as e:
+            # Kept for stop_recording to report
+            self._csv_error = e
+    
+    def _write_csv_rows(self):
+        q = self._csv_q
+        row = self._row_cache
+        pending = 0
+        deadline = time.monotonic() + CSV_FLUSH_INTERVAL_S
+        
+        while not (self._csv_stop.is_set() and q.empty()):
+            try:
+                timestamp, elapsed, weight = q.get(timeout=0.05)
+                row[0] = timestamp.strftime(CSV_TIMESTAMP_FMT)[:-3]
+                row[1] = f"{elapsed:.3f}"
+                row[2] = f"{weight:.2f}"
+                self.csv_writer.writerow(row)
+                pending += 1
+            except queue.Empty:
+                pass
             
-        except ValueError:
-            # Not a measurement, skip
-            pass
+            now = time.monotonic()
+            if pending >= CSV_FLUSH_ROWS or now >= deadline:
+                if pending:
+                    self.csv_file.flush()
+                    pending = 0
+                deadline = now + CSV_FLUSH_INTERVAL_S
+        self.csv_file.flush()
     
     def check_recording_duration(self):
         if self.recording:
-            elapsed = (datetime.now() - self.record_start_time).total_seconds()
+            elapsed = time.perf_counter() - self._t0_mono
             remaining = self.record_duration - elapsed
             
             if remaining > 0:
-                self.record_status.config(
-                    text=f"Recording...\n{remaining:.1f}s remaining",
-                    foreground="red"
-                )
-                self.root.after(100, self.check_recording_duration)
+                # Only touch the label when the displayed second changes
+                shown = math.ceil(remaining)
+                if shown != self._last_shown_remaining:
+                    self._last_shown_remaining = shown
+                    self.record_status.config(
+                        text=f"Recording...\n{shown}s remaining",
+                        foreground="red"
+                    )
             else:
-                self.stop_recording()
+                # Not called directly: stop_recording opens a modal dialog and
+                # this runs from inside the read handlers
+                self.root.after_idle(self._stop_if_recording)
+    
+    def _record_tick(self):
+        self._record_tick_id = None
+        if self.recording:
+            self.check_recording_duration()
+            self._record_tick_id = self.root.after(1000, self._record_tick)
+    
+    def _stop_if_recording(self):
+        # Several ticks may have scheduled this before it ran
+        if self.recording:
+            self.stop_recording()
         
     def on_closing(self):
-        self.reading = False
+        # Release a save_calibration still waiting for the scale factor
+        self._closed = True
+        self._scale_var.set(True)
+        self.stop_reading()
         if self.recording:
             self.stop_recording()
-        if self.arduino.is_connected():
-            self.arduino.disconnect()
+        # Unconditional: a failed write leaves the port open but not connected
+        self.arduino.disconnect()
         self.root.destroy()
 
 
@@ -0,0 +1,91 @@
+import struct
+import unittest
+
+from arduino_serial import ArduinoController, CHECKSUM_SEED, MAX_LINE_LENGTH, SAMPLE_TAG
+
+
+def frame(weight):
+    payload = struct.pack('<f', weight)
+    checksum = CHECKSUM_SEED
+    for b in payload:
+        checksum ^= b
+    return bytes([SAMPLE_TAG]) + payload + bytes([checksum])
+
+
+def parse_all(data, chunk=None):
+    '''Feed data to a fresh controller's parser, optionally in chunks'''
+    arduino = ArduinoController()
+    chunk = chunk or len(data)
+    messages = []
+    for i in range(0, len(data), chunk):
+        messages += arduino._parse(data[i:i + chunk])
+    return messages, arduino
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_frames_mixed_with_status_lines(self):
+        data = (b"TARED\r\n" + frame(12.5) + frame(-3.25)
+                + b"SCALE_FACTOR:1.5\r\n" + frame(10.0))
+        messages, _ = parse_all(data)
+        self.assertEqual(messages, ["TARED", 12.5, -3.25, "SCALE_FACTOR:1.5", 10.0])
+
+    def test_frames_split_across_reads(self):
+        data = frame(1.0) + b"MEASURING\r\n" + frame(2.0) + frame(3.0)
+        messages, arduino = parse_all(data, chunk=1)
+        self.assertEqual(messages, [1.0, "MEASURING", 2.0, 3.0])
+        self.assertEqual(arduino._rx_tail, b'')
+
+    def test_raw_counts_are_kept(self):
+        # Before calibration get_units() returns raw HX711 counts
+        messages, _ = parse_all(frame(2e6) + frame(8388607.0) + frame(-8388608.0))
+        self.assertEqual(messages, [2e6, 8388607.0, -8388608.0])
+
+    def test_bad_checksum_is_rejected(self):
+        bad = bytearray(frame(5.0))
+        bad[-1] ^= 0xFF
+        messages, _ = parse_all(bytes(bad) + frame(6.0) + b"STOPPED\r\n")
+        self.assertEqual(messages, [6.0, "STOPPED"])
+
+    def test_dropped_byte_mid_frame(self):
+        weights = [float(w) for w in range(1, 21)]
+        data = bytearray(b''.join(frame(w) for w in weights))
+        del data[7 * 6 + 3]  # lose one payload byte of the eighth frame
+        messages, arduino = parse_all(bytes(data) + b"STOPPED\r\n", chunk=16)
+        self.assertEqual(messages[-1], "STOPPED")
+        samples = messages[:-1]
+        self.assertTrue(set(samples) <= set(weights))
+        self.assertNotIn(8.0, samples)
+        self.assertEqual(samples[-5:], weights[-5:])
+        self.assertTrue(arduino._rx_synced)
+
+    def test_repeated_byte_loss_yields_no_bogus_samples(self):
+        weights = [struct.unpack('<f', struct.pack('<f', k * 0.37 - 500))[0]
+                   for k in range(3000)]
+        data = bytearray(b''.join(frame(w) for w in weights))
+        for k in range(len(data) - 100, 0, -293):
+            del data[k]
+        messages, _ = parse_all(bytes(data) + b"STOPPED\r\n", chunk=64)
+        self.assertEqual(messages[-1], "STOPPED")
+        self.assertTrue(set(messages[:-1]) <= set(weights))
+        self.assertGreater(len(messages), len(weights) * 0.9)
+
+    def test_starting_mid_frame(self):
+        data = frame(111.0)[3:] + frame(1.5) + frame(2.5) + b"STOPPED\r\n"
+        messages, _ = parse_all(data)
+        self.assertEqual(messages, [1.5, 2.5, "STOPPED"])
+
+    def test_overlong_line_is_dropped(self):
+        data = b"A" * (MAX_LINE_LENGTH * 3) + frame(4.0) + b"TARED\r\n"
+        messages, arduino = parse_all(data, chunk=32)
+        self.assertEqual(messages, [4.0, "TARED"])
+        self.assertEqual(arduino._rx_tail, b'')
+
+    def test_partial_line_is_buffered(self):
+        arduino = ArduinoController()
+        self.assertEqual(arduino._parse(b"CAL_TA"), [])
+        self.assertEqual(arduino._parse(b"RED\r\n"), ["CAL_TARED"])
+
+
+if __name__ == "__main__":
+    unittest.main()